@@ -228,7 +228,7 @@ def compare_objs(obj1, obj2, ignore_fields=None):
     """
 
     ret = {}
-    fields = obj1._meta.get_fields()
+    fields = obj1._meta.concrete_fields
     for f in fields:
         if ignore_fields and f.attname in ignore_fields:
             continue
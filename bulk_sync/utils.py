@@ -1,106 +1,520 @@
+import dataclasses
+import datetime
+import decimal
+import functools
+import io
+import itertools
 import typing
-import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from django.db import connection, transaction
 from django.db.models import Model, Field
 
 
-log = logging.getLogger(__name__)
 GenModel = typing.TypeVar('GenModel', bound=Model)
+# smaller temporary tables are not worth analyzing
+ANALYZE_THRESHOLD: int = 1000
+# CSV data buffered for one COPY statement by psycopg2, which has no streaming COPY api
+COPY_CHUNK_SIZE: int = 64 * 1024 * 1024
+# threads of `bulk_sync_many`, every one of them holds a DB connection
+SYNC_MAX_WORKERS: int = 4
 
 
-def create_temporary_model(model_klass: GenModel) -> type(GenModel):
-    model_name: str = model_klass._meta.model_name
+def temporary_table_name(model_klass: type(GenModel)) -> str:
+    return f"temp_{model_klass._meta.db_table}"
 
-    class Meta:
-        db_table: str = f"temp_{model_name}"
-        managed: bool = False
 
-    attrs: dict[str, str] = {
-        "__module__": __name__,
-        "Meta": Meta,
-    }
+def set_local_settings(cursor, **settings: typing.Optional[str]):
+    """It sets server settings for the rest of the current transaction, `None` values are skipped ..."""
+    for name, value in settings.items():
+        if value is not None:
+            cursor.execute("SELECT set_config(%s, %s, true)", [name, value])
 
-    for field in model_klass._meta.get_fields():
-        if isinstance(field, Field):
-            attrs[field.name] = field.clone()
 
-    # Dynamically made temporary model
-    return type(f"Temp{model_name.capitalize()}", (Model,), attrs)
+def create_temporary_table(real_model_klass: GenModel, temp_table: str):
+    """It creates empty table shaped like the real one ...
 
+    Temporary table is dropped automatically at the end of the transaction, so it has to be filled and synced within
+    one `transaction.atomic` block. Its pk column has neither default nor NOT NULL, so rows of instances without pk
+    keep it NULL instead of getting made up values which could match real rows. None of its columns is NOT NULL, so
+    instances missing values of columns which are not synced can be staged too.
 
-def create_temporary_table(real_model_klass: GenModel, temp_model_klass: type(GenModel)):
-    sql_command: str = f"CREATE TEMPORARY TABLE {temp_model_klass._meta.db_table} AS SELECT * FROM {real_model_klass._meta.db_table} LIMIT 0"
+    Args:
+        real_model_klass: model class the table is copied from
+        temp_table: name of the created table
+
+    Returns:
+        nothing
+    """
+    real_table: str = real_model_klass._meta.db_table
+    pk_column: str = connection.ops.quote_name(real_model_klass._meta.pk.column)
+    like: str = f"(LIKE {real_table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    if not connection.in_atomic_block:
+        raise RuntimeError("Temporary table is dropped on commit, it has to be created inside of `transaction.atomic`.")
+    sql_command: str = f"CREATE TEMPORARY TABLE {temp_table} {like} ON COMMIT DROP"
     with connection.cursor() as cursor:
         cursor.execute(sql_command)
+        # serial pk default would draw values from the real table sequence
+        not_nulls: str = ", ".join(
+            f"ALTER COLUMN {connection.ops.quote_name(field.column)} DROP NOT NULL"
+            for field in real_model_klass._meta.concrete_fields
+        )
+        cursor.execute(f"ALTER TABLE {temp_table} ALTER COLUMN {pk_column} DROP DEFAULT, {not_nulls}")
+
+
+def _copy_rows_psycopg3(cursor, copy_sql: str, rows: typing.Iterable[tuple]) -> int:
+    # psycopg 3 sends written rows on by itself, so one COPY streams them all with bounded client memory
+    count: int = 0
+    with cursor.copy(copy_sql) as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+def _copy_text(value) -> str:
+    """It renders not NULL value in PostgreSQL text input syntax ..."""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (str, int, float, decimal.Decimal, uuid.UUID, datetime.date, datetime.time)):
+        return str(value)
+    if isinstance(value, datetime.timedelta):
+        return f"{value.days} days {value.seconds} seconds {value.microseconds} microseconds"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(_array_item(item) for item in value) + "}"
+    if hasattr(value, "adapted") and hasattr(value, "dumps"):
+        # psycopg2 Json adapter returned by JSONField.get_db_prep_save
+        return value.dumps(value.adapted)
+    if hasattr(value, "addr"):
+        # psycopg2 Inet adapter returned by GenericIPAddressField.get_db_prep_save
+        return str(value.addr)
+    raise TypeError(f"Value of type {type(value).__name__} can't be rendered for COPY, psycopg2 would adapt it itself.")
+
+
+def _array_item(item) -> str:
+    if item is None:
+        return "NULL"
+    if isinstance(item, (list, tuple)):
+        # nested array stays unquoted, so it is read as a dimension and not as a string element
+        return _copy_text(item)
+    return '"' + _copy_text(item).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _csv_line(row: tuple) -> str:
+    # every not NULL value is quoted, unquoted empty field is the only NULL in COPY csv format
+    return ",".join("" if value is None else '"' + _copy_text(value).replace('"', '""') + '"' for value in row) + "\n"
+
+
+def _copy_rows_psycopg2(cursor, copy_sql: str, rows: typing.Iterable[tuple], chunk_size: int) -> int:
+    count: int = 0
+    stream = io.StringIO()
+    for row in rows:
+        stream.write(_csv_line(row))
+        count += 1
+        if stream.tell() >= chunk_size:
+            stream.seek(0)
+            cursor.copy_expert(copy_sql, stream)
+            stream = io.StringIO()
+    if stream.tell():
+        stream.seek(0)
+        cursor.copy_expert(copy_sql, stream)
+    return count
+
+
+def copy_records_to_table(table_name: str, fields: typing.Sequence[Field], instances: typing.Iterable[GenModel],
+                          chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """It streams instances into the table with COPY FROM STDIN ...
+
+    Args:
+        table_name: name of the table to fill
+        fields: concrete fields of the model, their columns are filled in the given order
+        instances: instances to copy
+        chunk_size: approximate size of CSV data in bytes buffered for one COPY statement on psycopg2, next chunk goes
+            by new COPY. psycopg 3 streams all rows by one COPY, so it is not used there.
+
+    Returns:
+        number of copied rows
+    """
+    columns: str = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    # pre_save fills auto_now and auto_now_add values the same way bulk_create does
+    rows = (
+        tuple(field.get_db_prep_save(field.pre_save(instance, True), connection=connection) for field in fields)
+        for instance in instances
+    )
+    with connection.cursor() as cursor:
+        if hasattr(cursor.cursor, "copy"):
+            # psycopg 3 adapts the values itself
+            return _copy_rows_psycopg3(cursor.cursor, f"COPY {table_name} ({columns}) FROM STDIN", rows)
+        else:
+            # psycopg2 has no row based COPY api, so we feed it with CSV
+            return _copy_rows_psycopg2(
+                cursor.cursor,
+                f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                rows,
+                chunk_size,
+            )
 
 
-def move_records_to_temporary_table(instances: list[GenModel], batch_size: int = None):
+def move_records_to_temporary_table(instances: typing.Iterable[GenModel], model_klass: type(GenModel) = None,
+                                    temp_buffers: typing.Optional[str] = None,
+                                    chunk_size: int = COPY_CHUNK_SIZE) -> str:
     """It creates temporary table in DB for session and copy instances there ...
 
     Args:
-        instances: list of original instances to sync
-        batch_size: how many records are saved at once with django bulk
+        instances: original instances to sync, any iterable, it is consumed once while streaming rows to COPY
+        model_klass: (optional) model class of the instances. If instances always contain at least one object, this
+            can be set automatically so is optional. Table is created even for no instances, so the sync against it
+            deletes all stale rows.
+        temp_buffers: (optional) `temp_buffers` for the transaction, e.g. '256MB', so the table stays in memory.
+            PostgreSQL refuses to change it once the session has touched any temporary table.
+        chunk_size: approximate size of CSV data in bytes buffered for one COPY statement on psycopg2
 
     Returns:
-        nothing
+        name of the temporary table
+    """
+    iterator: typing.Iterator[GenModel] = iter(instances)
+    first: typing.Optional[GenModel] = next(iterator, None)
+    if first is not None:
+        iterator = itertools.chain([first], iterator)
+        if model_klass is None:
+            model_klass = first.__class__
+    if model_klass is None:
+        raise RuntimeError(
+            "Unable to identify model to sync. Need to provide at least one object in `instances` or `model_klass`."
+        )
+
+    temp_table: str = temporary_table_name(model_klass)
+    with connection.cursor() as cursor:
+        set_local_settings(cursor, temp_buffers=temp_buffers)
+    create_temporary_table(model_klass, temp_table)
+    count: int = copy_records_to_table(
+        temp_table, model_klass._meta.concrete_fields, iterator, chunk_size=chunk_size
+    )
+    if count >= ANALYZE_THRESHOLD:
+        # fresh table has no statistics, planner would guess its size and may pick nested loops over hash joins
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {temp_table}")
+    return temp_table
+
+
+# (DB alias, table, key columns) known to have unique index usable by ON CONFLICT
+_unique_keys: set[tuple[str, str, frozenset[str]]] = set()
+
+
+def has_unique_constraint(cursor, table_name: str, columns: typing.Iterable[str]) -> bool:
+    """It checks the table has unique constraint or index on exactly the given columns, usable by ON CONFLICT ...
+
+    Partial, expression and deferrable unique indexes don't count, ON CONFLICT can't infer them. Found ones are
+    remembered, so the catalog is queried just once per table and columns.
+    """
+    key: tuple[str, str, frozenset[str]] = (connection.alias, table_name, frozenset(columns))
+    if key in _unique_keys:
+        return True
+    cursor.execute(
+        """
+SELECT array_agg(key_column.attname::text)
+FROM pg_index
+JOIN pg_attribute AS key_column
+    ON key_column.attrelid = pg_index.indrelid
+    AND key_column.attnum = ANY((pg_index.indkey::int2[])[0:pg_index.indnkeyatts - 1])
+WHERE pg_index.indrelid = %s::regclass AND pg_index.indisunique AND pg_index.indimmediate
+    AND pg_index.indpred IS NULL AND pg_index.indexprs IS NULL
+GROUP BY pg_index.indexrelid""",
+        [table_name],
+    )
+    if any(frozenset(index_columns) == key[2] for index_columns, in cursor.fetchall()):
+        _unique_keys.add(key)
+        return True
+    return False
+
+
+def drop_secondary_indexes(cursor, table_name: str, keep_columns: typing.Iterable[str]) -> list[str]:
+    """It drops non unique indexes of the table and returns their definitions to recreate them later ...
+
+    Indexes leading with one of `keep_columns` are kept, the sync joins on them.
     """
-    if len(instances) == 0:
-        # nothing to do
-        return
+    cursor.execute(
+        """
+SELECT pg_index.indexrelid::regclass::text, pg_get_indexdef(pg_index.indexrelid), leading_column.attname
+FROM pg_index
+LEFT JOIN pg_attribute AS leading_column
+    ON leading_column.attrelid = pg_index.indrelid AND leading_column.attnum = pg_index.indkey[0]
+WHERE pg_index.indrelid = %s::regclass AND NOT pg_index.indisunique AND NOT pg_index.indisexclusion""",
+        [table_name],
+    )
+    set_keep_columns: set[str] = set(keep_columns)
+    definitions: list[str] = []
+    for index_name, definition, leading_column in cursor.fetchall():
+        if leading_column in set_keep_columns:
+            continue
+        cursor.execute(f"DROP INDEX {index_name}")
+        definitions.append(definition)
+    return definitions
+
+
+# merge_action() values mapped to stats keys
+MERGE_ACTIONS: dict[str, str] = {"INSERT": "inserted", "UPDATE": "updated", "DELETE": "deleted"}
+
+
+@dataclasses.dataclass(frozen=True)
+class SyncSpec:
+    """Columns synced by `bulk_sync`, set algebra over them is done once per spec ...
+
+    Args:
+        key_fields: columns matching temporary rows to the real ones
+        fields: columns to sync
+        exclude_fields: columns not to sync
+    """
+    key_fields: tuple[str, ...]
+    fields: tuple[str, ...]
+    exclude_fields: tuple[str, ...] = ()
+
+    def __post_init__(self):
+        # lists are accepted too, stored as tuples the spec stays hashable, single column may be given by its name
+        for name in ("key_fields", "fields", "exclude_fields"):
+            value = getattr(self, name) or ()
+            object.__setattr__(self, name, (value,) if isinstance(value, str) else tuple(value))
+
+    @functools.cached_property
+    def update_columns(self) -> tuple[str, ...]:
+        skipped: set[str] = set(self.key_fields) | set(self.exclude_fields)
+        return tuple(name for name in self.fields if name not in skipped)
+
+    @functools.cached_property
+    def insert_columns(self) -> tuple[str, ...]:
+        return self.key_fields + self.update_columns
+
+
+class SyncSql(typing.NamedTuple):
+    merge: typing.Optional[str]
+    update: typing.Optional[str]
+    insert: typing.Optional[str]
+    delete: typing.Optional[str]
+    duplicates: typing.Optional[str]
+
+
+@functools.lru_cache(maxsize=128)
+def _build_sync_sql(model_table: str, pk_column: str, temp_table: str, spec: SyncSpec, skip_creates: bool,
+                    skip_updates: bool, skip_deletes: bool, use_merge: bool,
+                    delete_filter: typing.Optional[str] = None) -> SyncSql:
+    """It renders SQL statements of `bulk_sync`, statements which are not going to run are `None` ..."""
+    insert_fields = ", ".join(spec.insert_columns)
+    origin_fields = ", ".join(f"origin.{name}" for name in spec.insert_columns)
+    join_filter = " AND ".join([f"origin.{key_name} = upstream.{key_name}" for key_name in spec.key_fields])
+    # target columns of UPDATE SET can't be qualified by the table alias
+    updated_fields = ", ".join(f"{name} = origin.{name}" for name in spec.update_columns)
+
+    merge_sql = update_sql = insert_sql = delete_sql = duplicates_sql = None
+    # with no columns to update there is nothing to run for matching rows, empty SET is a syntax error
+    update_rows: bool = not skip_updates and bool(spec.update_columns)
+    insert_only: bool = skip_updates and skip_deletes and not skip_creates
+    if insert_only:
+        # insert only sync lets the unique index on key columns sort out existing rows, no anti-join needed
+        insert_sql = f"""
+INSERT INTO {model_table} ({insert_fields})
+SELECT {origin_fields} FROM {temp_table} AS origin
+ON CONFLICT ({", ".join(spec.key_fields)}) DO NOTHING;"""
+    elif use_merge:
+        merge_actions: list[str] = []
+        if update_rows:
+            merge_actions.append(f"WHEN MATCHED THEN UPDATE SET {updated_fields}")
+        if not skip_creates:
+            merge_actions.append(f"WHEN NOT MATCHED THEN INSERT ({insert_fields}) VALUES ({origin_fields})")
+        if merge_actions:
+            merge_sql = f"""
+WITH merged_rows AS (
+    MERGE INTO {model_table} AS upstream
+    USING {temp_table} AS origin ON {join_filter}
+    {" ".join(merge_actions)}
+    RETURNING merge_action() AS action
+)
+SELECT action, COUNT(*) FROM merged_rows GROUP BY action;"""
     else:
-        try:
-            model_klass: GenModel = instances[0].__class__
-        except AttributeError:
-            log.exception("Cannot get model_klass from list of instances to sync.")
-            return
+        if update_rows:
+            update_sql = f"""
+UPDATE {model_table} AS upstream
+SET {updated_fields} FROM {temp_table} AS origin WHERE {join_filter};"""
+        if not skip_creates:
+            insert_sql = f"""
+INSERT INTO {model_table} ({insert_fields})
+SELECT {origin_fields} FROM {temp_table} AS origin
+LEFT JOIN {model_table} AS upstream ON {join_filter}
+WHERE upstream.{pk_column} IS NULL;"""
+    if not skip_deletes:
+        scope: str = f" AND ({delete_filter})" if delete_filter else ""
+        delete_sql = f"""
+DELETE FROM {model_table} AS upstream
+WHERE NOT EXISTS (SELECT 1 FROM {temp_table} AS origin WHERE {join_filter}){scope};"""
+    if merge_sql or update_sql or (insert_sql and not insert_only):
+        # rows with NULL in any key never match, so they are not duplicates
+        not_null_keys = " AND ".join(f"origin.{key_name} IS NOT NULL" for key_name in spec.key_fields)
+        duplicates_sql = f"""
+SELECT 1 FROM {temp_table} AS origin WHERE {not_null_keys}
+GROUP BY {", ".join(f"origin.{key_name}" for key_name in spec.key_fields)} HAVING COUNT(*) > 1 LIMIT 1;"""
+    return SyncSql(
+        merge=merge_sql, update=update_sql, insert=insert_sql, delete=delete_sql, duplicates=duplicates_sql
+    )
+
+
+def bulk_sync(model_klass: GenModel, temp_table: str, spec: SyncSpec, skip_creates: bool = True,
+              skip_updates: bool = True, skip_deletes: bool = True, delete_filter: typing.Optional[str] = None,
+              use_merge: typing.Optional[bool] = None, defer_indexes: bool = False,
+              disable_triggers: bool = False,
+              synchronous_commit: typing.Optional[str] = None, work_mem: typing.Optional[str] = None):
+    """It syncs the real table with the temporary one ...
 
-    temp_model_klass: GenModel = create_temporary_model(model_klass=model_klass)
-    create_temporary_table(model_klass, temp_model_klass)
+    Inserts and updates are done by single MERGE statement when `use_merge` is set, otherwise by separate INSERT and
+    UPDATE passes. MERGE stats are read from `RETURNING merge_action()`, so it needs PostgreSQL 17 or newer.
+    Insert only sync (just `skip_creates` unset) is a single `INSERT ... ON CONFLICT DO NOTHING` instead, it needs
+    unique constraint or index on `key_fields`.
 
-    temp_model_klass.objects.bulk_create(instances, batch_size=batch_size)
+    Rows are matched by joining on `key_fields`, so the real table should have an index on them, otherwise every pass
+    ends up scanning it whole. Keys of the temporary table have to be unique, MERGE fails on a real row matched
+    twice while UPDATE would pick one of the temporary rows arbitrarily, so duplicate keys are rejected up front
+    whenever rows are going to be inserted or updated (insert only sync just skips them by ON CONFLICT).
 
+    Args:
+        model_klass: model class of the real table
+        temp_table: name of the temporary table filled by `move_records_to_temporary_table`
+        spec: columns to match and sync
+        skip_creates: do not insert missing rows
+        skip_updates: do not update matching rows
+        skip_deletes: do not delete stale rows, i.e. real rows with no match in the temporary table
+        delete_filter: (optional) SQL condition limiting deleted rows, e.g. to one partition of the table. The real
+            table is aliased `upstream`.
+        use_merge: use MERGE statement, by default it is used when the server supports it
+        defer_indexes: drop non unique indexes of the real table before the sync and build them again after it, which
+            is cheaper than maintaining them row by row on very large syncs. DROP INDEX holds ACCESS EXCLUSIVE lock
+            on the table till the end of the transaction, so other sessions can't even read it meanwhile.
+        disable_triggers: set `session_replication_role` to 'replica' for the transaction, so triggers and foreign key
+            checks are skipped. Needs superuser and the synced data must be consistent on its own.
+        synchronous_commit: (optional) `synchronous_commit` for the transaction, 'off' lets the commit skip waiting
+            for WAL flush. A crash may then lose the sync, which is fine as long as it can be run again.
+        work_mem: (optional) `work_mem` for the transaction, e.g. '128MB', so hash joins don't spill to disk
 
-def bulk_sync(model_klass: GenModel, temp_model_klass: GenModel, key_fields: list[str], fields: list[str] = None,
-              exclude_fields: list[str] = None, skip_creates: bool = True, skip_updates: bool = True,
-              skip_deletes: bool = True):
+    Returns:
+        dict with stats of inserted, updated and deleted rows
+    """
     stats = {"inserted": 0, "updated": 0, "deleted": 0}
-    set_key_fields = set(key_fields)
-    set_fields = set(fields)
-    set_exclude_fields = set(exclude_fields)
+    if use_merge is None:
+        use_merge = connection.pg_version >= 170000
+    elif use_merge and connection.pg_version < 170000:
+        raise RuntimeError("MERGE with RETURNING is supported since PostgreSQL 17.")
+    insert_only: bool = skip_updates and skip_deletes and not skip_creates
+    sync_sql: SyncSql = _build_sync_sql(
+        model_klass._meta.db_table,
+        model_klass._meta.pk.column,
+        temp_table,
+        spec,
+        bool(skip_creates),
+        bool(skip_updates),
+        bool(skip_deletes),
+        use_merge,
+        delete_filter,
+    )
     with transaction.atomic():
         with connection.cursor() as cursor:
-            if not skip_creates:
-                insert_fields = ", ".join(set_key_fields | set_fields - set_exclude_fields)
-                lookup_fields = ", ".join(set_key_fields)
-                origin_fields = ", ".join([f"origin.{name}" for name in insert_fields])
-                join_filter = " AND ".join([f"origin.{key_name} = upstream.{key_name}" for key_name in key_fields])
-
-                insert_sql = f"""
-WITH inserted_rows AS (
-    INSERT INTO {model_klass._meta.db_table} ({insert_fields})
-    SELECT {origin_fields} FROM {temp_model_klass._meta.db_table} AS origin
-    WHERE NOT EXISTS (
-        SELECT 1 FROM {model_klass._meta.db_table} AS upstream WHERE {join_filter}
-    )
-    RETURNING {lookup_fields}
-)
-DELETE FROM {temp_model_klass._meta.db_table} WHERE {lookup_fields} IN (SELECT {lookup_fields} FROM inserted_rows)
-RETURNING COUNT(*) AS inserted_count;"""
-
-                cursor.execute(insert_sql)
-                stats["inserted"] = cursor.fetchone()[0]
-            if not skip_updates:
-                updated_fields = ", ".join([f"upstream.{field_name} = origin.{field_name}" for field_name in set_fields - set_exclude_fields])
-
-                update_sql = f"""
-WITH updated_rows AS (
-    UPDATE {model_klass._meta.db_table} AS upstream
-    SET {updated_fields} FROM {temp_model_klass._meta.db_table} AS origin WHERE {join_filter}
-    RETURNING {lookup_fields}
-)
-DELETE FROM {temp_model_klass._meta.db_table} WHERE {lookup_fields} IN (SELECT {lookup_fields} FROM updated_rows)
-RETURNING COUNT(*) AS updated_count;"""
-
-                cursor.execute(update_sql)
-                stats["updated"] = cursor.fetchone()[0]
+            if insert_only and not has_unique_constraint(cursor, model_klass._meta.db_table, spec.key_fields):
+                raise RuntimeError(
+                    f'Insert only sync needs unique constraint on {spec.key_fields} of "{model_klass._meta.db_table}".'
+                )
+            if sync_sql.duplicates:
+                cursor.execute(sync_sql.duplicates)
+                if cursor.fetchone():
+                    raise RuntimeError(f'Temporary table "{temp_table}" has more rows with the same {spec.key_fields}.')
+            set_local_settings(
+                cursor,
+                synchronous_commit=synchronous_commit,
+                work_mem=work_mem,
+                session_replication_role="replica" if disable_triggers else None,
+            )
+            index_definitions: list[str] = []
+            if defer_indexes:
+                index_definitions = drop_secondary_indexes(cursor, model_klass._meta.db_table, spec.key_fields)
+            if sync_sql.merge:
+                cursor.execute(sync_sql.merge)
+                for action, count in cursor.fetchall():
+                    stats[MERGE_ACTIONS[action]] = count
+            # updates go first, so the insert pass sees the rows already in the real table and temporary rows
+            # don't have to be deleted to avoid counting them twice
+            if sync_sql.update:
+                cursor.execute(sync_sql.update)
+                stats["updated"] = cursor.rowcount
+            if sync_sql.insert:
+                cursor.execute(sync_sql.insert)
+                stats["inserted"] = cursor.rowcount
+            if sync_sql.delete:
+                cursor.execute(sync_sql.delete)
+                stats["deleted"] = cursor.rowcount
+            # CREATE INDEX CONCURRENTLY can't run in transaction, so indexes are built by plain CREATE INDEX
+            for definition in index_definitions:
+                cursor.execute(definition)
+            # processed rows are dropped at once instead of row by row
+            cursor.execute(f"TRUNCATE {temp_table}")
     return {"stats": stats}
+
+
+@dataclasses.dataclass
+class SyncJob:
+    """One model sync run by `bulk_sync_many`, attributes are passed to `move_records_to_temporary_table` and
+    `bulk_sync` ..."""
+    model_klass: type(GenModel)
+    instances: typing.Iterable[GenModel]
+    spec: SyncSpec
+    skip_creates: bool = True
+    skip_updates: bool = True
+    skip_deletes: bool = True
+    delete_filter: typing.Optional[str] = None
+    use_merge: typing.Optional[bool] = None
+    defer_indexes: bool = False
+    disable_triggers: bool = False
+    synchronous_commit: typing.Optional[str] = None
+    work_mem: typing.Optional[str] = None
+    temp_buffers: typing.Optional[str] = None
+    chunk_size: int = COPY_CHUNK_SIZE
+
+
+def _run_sync_job(job: SyncJob) -> dict:
+    # `connection` is thread local, so every worker thread talks to the DB over its own connection
+    try:
+        with transaction.atomic():
+            temp_table: str = move_records_to_temporary_table(
+                job.instances, model_klass=job.model_klass, temp_buffers=job.temp_buffers, chunk_size=job.chunk_size
+            )
+            return bulk_sync(
+                job.model_klass,
+                temp_table,
+                job.spec,
+                skip_creates=job.skip_creates,
+                skip_updates=job.skip_updates,
+                skip_deletes=job.skip_deletes,
+                delete_filter=job.delete_filter,
+                use_merge=job.use_merge,
+                defer_indexes=job.defer_indexes,
+                disable_triggers=job.disable_triggers,
+                synchronous_commit=job.synchronous_commit,
+                work_mem=job.work_mem,
+            )
+    finally:
+        connection.close()
+
+
+def bulk_sync_many(jobs: list[SyncJob], max_workers: int = SYNC_MAX_WORKERS) -> list[dict]:
+    """It runs independent syncs concurrently, each one in its own thread, connection and transaction ...
+
+    Jobs don't share a transaction, so a failing job doesn't roll back the others. Its exception is raised once
+    the preceding jobs are collected.
+
+    Args:
+        jobs: syncs to run
+        max_workers: number of threads, each of them holds one DB connection while it runs a job
+
+    Returns:
+        list of `bulk_sync` results in the order of jobs
+    """
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        return list(executor.map(_run_sync_job, jobs))
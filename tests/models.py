@@ -52,3 +52,26 @@ class EmployeeOffice(models.Model):
 
     def __str__(self):
         return "EmployeeOffice: {} employee {} office {}".format(self.employee.name, self.office.id)
+
+
+class Product(models.Model):
+    code = models.CharField(max_length=40, unique=True)
+    name = models.CharField(max_length=140, db_index=True)
+    price = models.IntegerField()
+    category = models.CharField(max_length=40)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["name"], condition=models.Q(price__gt=0), name="unique_priced_product_name")
+        ]
+
+    def __str__(self):
+        return "Product: {} {} price {}".format(self.code, self.name, self.price)
+
+
+class Document(models.Model):
+    code = models.CharField(max_length=40, unique=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return "Document: {} created {}".format(self.code, self.created)
@@ -0,0 +1,406 @@
+import datetime
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from bulk_sync.utils import (
+    SyncJob,
+    SyncSpec,
+    _build_sync_sql,
+    _copy_rows_psycopg2,
+    _copy_rows_psycopg3,
+    bulk_sync,
+    bulk_sync_many,
+    has_unique_constraint,
+    move_records_to_temporary_table,
+)
+from .models import Company, Document, Employee, Product
+
+
+class FakeCopyCursor:
+    """ Collects data psycopg2 would send by `copy_expert` """
+
+    def __init__(self):
+        self.copies = []
+
+    def copy_expert(self, sql, stream):
+        self.copies.append(stream.read())
+
+
+class FakeCopy:
+    def __init__(self, copies):
+        self.rows = []
+        copies.append(self.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+
+class FakePsycopg3Cursor:
+    """ Collects rows psycopg 3 would send by `copy` """
+
+    def __init__(self):
+        self.copies = []
+
+    def copy(self, sql):
+        return FakeCopy(self.copies)
+
+
+class Json:
+    """ Mimics psycopg2.extras.Json adapter """
+
+    def __init__(self, adapted):
+        self.adapted = adapted
+
+    def dumps(self, obj):
+        return "dumped:" + repr(obj)
+
+
+class CopyCsvTests(SimpleTestCase):
+    """ Test CSV fed to COPY by psycopg2 """
+
+    def copy(self, rows, chunk_size=1024):
+        cursor = FakeCopyCursor()
+        count = _copy_rows_psycopg2(cursor, "COPY", rows, chunk_size)
+        return count, cursor.copies
+
+    def test_null_is_the_only_unquoted_value(self):
+        count, copies = self.copy([(None, "", "\\N", 1, "a,b")])
+        self.assertEqual(1, count)
+        self.assertEqual([',"","\\N","1","a,b"\n'], copies)
+
+    def test_quotes_are_doubled(self):
+        count, copies = self.copy([('say "hi"',)])
+        self.assertEqual(['"say ""hi"""\n'], copies)
+
+    def test_bool(self):
+        count, copies = self.copy([(True, False)])
+        self.assertEqual(['"t","f"\n'], copies)
+
+    def test_bytes_as_bytea_hex(self):
+        count, copies = self.copy([(b"\x01\xff", memoryview(b"\x02"))])
+        self.assertEqual(['"\\x01ff","\\x02"\n'], copies)
+
+    def test_list_as_array_literal(self):
+        count, copies = self.copy([([1, None, 'a"b\\c'],)])
+        self.assertEqual(['"{""1"",NULL,""a\\""b\\\\c""}"\n'], copies)
+
+    def test_nested_list_as_multidimensional_array(self):
+        count, copies = self.copy([([[1, 2], [3, 4]],)])
+        self.assertEqual(['"{{""1"",""2""},{""3"",""4""}}"\n'], copies)
+
+    def test_timedelta_as_interval(self):
+        count, copies = self.copy([(datetime.timedelta(days=-1, seconds=5, microseconds=6),)])
+        self.assertEqual(['"-1 days 5 seconds 6 microseconds"\n'], copies)
+
+    def test_unknown_type_raises(self):
+        # e.g. HStoreField value, its text syntax is not JSON
+        with self.assertRaises(TypeError):
+            self.copy([({"a": "b"},)])
+
+    def test_json_adapter_uses_its_dumps(self):
+        count, copies = self.copy([(Json({"a": 1}),)])
+        self.assertEqual(['"dumped:{\'a\': 1}"\n'], copies)
+
+    def test_chunks(self):
+        count, copies = self.copy([(index,) for index in range(5)], chunk_size=8)
+        self.assertEqual(5, count)
+        self.assertEqual(['"0"\n"1"\n', '"2"\n"3"\n', '"4"\n'], copies)
+
+
+class CopyPsycopg3Tests(SimpleTestCase):
+    """ Test COPY of psycopg 3 """
+
+    def test_rows_go_by_one_copy(self):
+        cursor = FakePsycopg3Cursor()
+        count = _copy_rows_psycopg3(cursor, "COPY", (("abc", index) for index in range(5)))
+        self.assertEqual(5, count)
+        self.assertEqual([[("abc", index) for index in range(5)]], cursor.copies)
+
+    def test_no_rows(self):
+        cursor = FakePsycopg3Cursor()
+        self.assertEqual(0, _copy_rows_psycopg3(cursor, "COPY", []))
+
+
+class SyncSpecTests(SimpleTestCase):
+    """ Test `SyncSpec` columns """
+
+    def test_columns_keep_order_and_skip_keys_and_excluded(self):
+        spec = SyncSpec(["name"], ["age", "name", "company_id"], ["company_id"])
+        self.assertEqual(("name", "age"), spec.insert_columns)
+        self.assertEqual(("age",), spec.update_columns)
+
+    def test_lists_are_stored_as_tuples(self):
+        spec = SyncSpec(["name"], ["age"], None)
+        self.assertEqual(SyncSpec(("name",), ("age",)), spec)
+        self.assertEqual(hash(SyncSpec(("name",), ("age",))), hash(spec))
+
+    def test_string_is_single_column(self):
+        spec = SyncSpec("code", ["name"], "price")
+        self.assertEqual(("code", "name"), spec.insert_columns)
+        self.assertEqual(("price",), spec.exclude_fields)
+
+
+class BuildSyncSqlTests(SimpleTestCase):
+    """ Test SQL rendered by `_build_sync_sql` """
+
+    spec = SyncSpec(["name", "company_id"], ["age", "name"])
+
+    def build(self, spec=None, skip_creates=False, skip_updates=False, skip_deletes=False, use_merge=False,
+              delete_filter=None):
+        return _build_sync_sql(
+            "employee", "id", "temp_employee", spec or self.spec, skip_creates, skip_updates, skip_deletes,
+            use_merge, delete_filter
+        )
+
+    def test_column_lists(self):
+        sql = self.build()
+        self.assertIsNone(sql.merge)
+        self.assertIn("SET age = origin.age FROM temp_employee AS origin", sql.update)
+        self.assertIn("origin.name = upstream.name AND origin.company_id = upstream.company_id", sql.update)
+        self.assertIn("INSERT INTO employee (name, company_id, age)", sql.insert)
+        self.assertIn("SELECT origin.name, origin.company_id, origin.age FROM temp_employee AS origin", sql.insert)
+        self.assertIn("WHERE upstream.id IS NULL", sql.insert)
+
+    def test_merge(self):
+        sql = self.build(use_merge=True)
+        self.assertIsNone(sql.update)
+        self.assertIsNone(sql.insert)
+        self.assertIn("WHEN MATCHED THEN UPDATE SET age = origin.age", sql.merge)
+        self.assertIn(
+            "WHEN NOT MATCHED THEN INSERT (name, company_id, age) VALUES (origin.name, origin.company_id, origin.age)",
+            sql.merge,
+        )
+
+    def test_no_update_columns_skips_update(self):
+        spec = SyncSpec(["name"], ["name", "age"], ["age"])
+        sql = self.build(spec=spec)
+        self.assertIsNone(sql.update)
+        self.assertIn("INSERT INTO employee (name)", sql.insert)
+        sql = self.build(spec=spec, use_merge=True)
+        self.assertNotIn("WHEN MATCHED", sql.merge)
+        self.assertIsNone(self.build(spec=spec, skip_creates=True, use_merge=True).merge)
+
+    def test_insert_only_uses_on_conflict(self):
+        sql = self.build(skip_updates=True, skip_deletes=True, use_merge=True)
+        self.assertIsNone(sql.merge)
+        self.assertIsNone(sql.update)
+        self.assertIsNone(sql.delete)
+        self.assertIn("ON CONFLICT (name, company_id) DO NOTHING", sql.insert)
+
+    def test_duplicates_checked_when_rows_are_inserted_or_updated(self):
+        self.assertIn("GROUP BY origin.name, origin.company_id HAVING COUNT(*) > 1", self.build().duplicates)
+        self.assertIsNotNone(self.build(use_merge=True).duplicates)
+        self.assertIsNotNone(self.build(skip_updates=True).duplicates)
+        self.assertIsNone(self.build(skip_updates=True, skip_deletes=True).duplicates)
+        self.assertIsNone(self.build(skip_creates=True, skip_updates=True).duplicates)
+
+    def test_delete_filter(self):
+        self.assertIsNone(self.build(skip_deletes=True).delete)
+        self.assertTrue(self.build().delete.strip().endswith("upstream.company_id);"))
+        sql = self.build(delete_filter="upstream.company_id = 1")
+        self.assertTrue(sql.delete.strip().endswith(") AND (upstream.company_id = 1);"))
+
+
+def product_names():
+    return list(Product.objects.order_by("code").values_list("code", "name", "price"))
+
+
+@skipUnless(connection.vendor == "postgresql", "bulk_sync.utils needs PostgreSQL")
+class PostgresBulkSyncTests(TestCase):
+    """ Test `bulk_sync.utils` against PostgreSQL, every test runs one sync as the temporary table lives till commit """
+
+    spec = SyncSpec(["code"], ["name", "price", "category"])
+
+    def setUp(self):
+        self.p1 = Product.objects.create(code="A", name="Apple", price=10, category="fruit")
+        self.p2 = Product.objects.create(code="B", name="Banana", price=20, category="fruit")
+        self.p3 = Product.objects.create(code="C", name="Carrot", price=30, category="vegetable")
+
+    def sync(self, instances, spec=None, **kwargs):
+        with transaction.atomic():
+            temp_table = move_records_to_temporary_table(instances, model_klass=Product)
+            return bulk_sync(Product, temp_table, spec or self.spec, **kwargs)["stats"]
+
+    def new_products(self):
+        return [
+            Product(code="A", name="Apple", price=11, category="fruit"),
+            Product(code="B", name="Banana", price=20, category="fruit"),
+            Product(code="D", name="Date", price=40, category="fruit"),
+        ]
+
+    def test_insert_update_delete(self):
+        stats = self.sync(
+            self.new_products(), skip_creates=False, skip_updates=False, skip_deletes=False, use_merge=False
+        )
+
+        self.assertEqual({"inserted": 1, "updated": 2, "deleted": 1}, stats)
+        self.assertEqual([("A", "Apple", 11), ("B", "Banana", 20), ("D", "Date", 40)], product_names())
+        self.assertEqual(self.p1.pk, Product.objects.get(code="A").pk)
+
+    def test_merge(self):
+        if connection.pg_version < 170000:
+            self.skipTest("MERGE with RETURNING needs PostgreSQL 17")
+        stats = self.sync(
+            self.new_products(), skip_creates=False, skip_updates=False, skip_deletes=False, use_merge=True
+        )
+
+        self.assertEqual({"inserted": 1, "updated": 2, "deleted": 1}, stats)
+        self.assertEqual([("A", "Apple", 11), ("B", "Banana", 20), ("D", "Date", 40)], product_names())
+
+    def test_delete_filter(self):
+        stats = self.sync(
+            [Product(code="A", name="Apple", price=10, category="fruit")],
+            skip_deletes=False,
+            delete_filter="upstream.category = 'fruit'",
+        )
+
+        self.assertEqual({"inserted": 0, "updated": 0, "deleted": 1}, stats)
+        self.assertEqual([("A", "Apple", 10), ("C", "Carrot", 30)], product_names())
+
+    def test_no_instances_deletes_all(self):
+        stats = self.sync([], skip_deletes=False)
+
+        self.assertEqual({"inserted": 0, "updated": 0, "deleted": 3}, stats)
+        self.assertEqual([], product_names())
+
+    def test_pk_as_key(self):
+        stats = self.sync(
+            [Product(pk=self.p2.pk, code="B", name="Blueberry", price=25, category="fruit")],
+            spec=SyncSpec(["id"], ["name", "price"]),
+            skip_updates=False,
+            skip_deletes=False,
+        )
+
+        self.assertEqual({"inserted": 0, "updated": 1, "deleted": 2}, stats)
+        self.assertEqual([("B", "Blueberry", 25)], product_names())
+
+    def test_insert_only_on_conflict(self):
+        stats = self.sync(self.new_products(), skip_creates=False)
+
+        self.assertEqual({"inserted": 1, "updated": 0, "deleted": 0}, stats)
+        self.assertEqual(
+            [("A", "Apple", 10), ("B", "Banana", 20), ("C", "Carrot", 30), ("D", "Date", 40)], product_names()
+        )
+
+    def test_duplicate_keys_are_rejected(self):
+        products = self.new_products() + [Product(code="A", name="Avocado", price=12, category="fruit")]
+        with self.assertRaises(RuntimeError):
+            self.sync(products, skip_updates=False, use_merge=connection.pg_version >= 170000)
+
+        self.assertEqual([("A", "Apple", 10), ("B", "Banana", 20), ("C", "Carrot", 30)], product_names())
+
+    def test_insert_only_needs_unique_constraint(self):
+        with self.assertRaises(RuntimeError):
+            self.sync(self.new_products(), spec=SyncSpec(["name"], ["price"]), skip_creates=False)
+
+    def test_has_unique_constraint(self):
+        with connection.cursor() as cursor:
+            self.assertTrue(has_unique_constraint(cursor, Product._meta.db_table, ["code"]))
+            self.assertTrue(has_unique_constraint(cursor, Product._meta.db_table, ["id"]))
+            # partial unique index can't be inferred by ON CONFLICT
+            self.assertFalse(has_unique_constraint(cursor, Product._meta.db_table, ["name"]))
+            self.assertFalse(has_unique_constraint(cursor, Product._meta.db_table, ["code", "name"]))
+
+    def test_defer_indexes(self):
+        def indexes():
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, Product._meta.db_table)
+            return sorted((name, tuple(c["columns"]), c["unique"]) for name, c in constraints.items() if c["index"])
+
+        before = indexes()
+        self.assertIn(("name",), [columns for name, columns, unique in before if not unique])
+
+        stats = self.sync(self.new_products(), skip_creates=False, skip_updates=False, defer_indexes=True)
+
+        self.assertEqual({"inserted": 1, "updated": 2, "deleted": 0}, stats)
+        self.assertEqual(before, indexes())
+
+
+@skipUnless(connection.vendor == "postgresql", "bulk_sync.utils needs PostgreSQL")
+class PostgresCopyTests(TestCase):
+    """ Test temporary table load against PostgreSQL """
+
+    def test_chunks_and_values(self):
+        company = Company.objects.create(name="Foo Products, Ltd.")
+        names = [None, "", "\\N", 'say "hi"', "a,b"] * 3
+
+        with transaction.atomic():
+            temp_table = move_records_to_temporary_table(
+                (Employee(name=name, age=age, company=company) for age, name in enumerate(names)), chunk_size=1
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT id, name, company_id FROM {temp_table} ORDER BY age")
+                rows = cursor.fetchall()
+
+        self.assertEqual([(None, name, company.pk) for name in names], rows)
+
+    def test_auto_now_add(self):
+        with transaction.atomic():
+            temp_table = move_records_to_temporary_table([Document(code="A")], model_klass=Document)
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT code, created IS NOT NULL FROM {temp_table}")
+                rows = cursor.fetchall()
+
+        self.assertEqual([("A", True)], rows)
+
+    def test_columns_not_synced_may_be_missing(self):
+        company = Company.objects.create(name="Foo Products, Ltd.")
+        Employee.objects.create(name="Scott", age=40, company=company)
+
+        with transaction.atomic():
+            temp_table = move_records_to_temporary_table([Employee(name="Scott", age=41)], model_klass=Employee)
+            ret = bulk_sync(Employee, temp_table, SyncSpec(["name"], ["age"]), skip_updates=False)
+
+        self.assertEqual(1, ret["stats"]["updated"])
+        self.assertEqual([("Scott", 41, company.pk)], list(Employee.objects.values_list("name", "age", "company_id")))
+
+
+@skipUnless(connection.vendor == "postgresql", "bulk_sync.utils needs PostgreSQL")
+class PostgresBulkSyncManyTests(TransactionTestCase):
+    """ Test `bulk_sync_many`, jobs commit in their own threads and connections """
+
+    def test_bulk_sync_many(self):
+        company = Company.objects.create(name="Foo Products, Ltd.")
+        Employee.objects.create(name="Scott", age=40, company=company)
+        Employee.objects.create(name="Zoe", age=9, company=company)
+        Product.objects.create(code="A", name="Apple", price=10, category="fruit")
+
+        results = bulk_sync_many(
+            [
+                SyncJob(
+                    Employee,
+                    [Employee(name="Scott", age=41, company=company)],
+                    SyncSpec(["name"], ["age"]),
+                    skip_updates=False,
+                    skip_deletes=False,
+                    use_merge=False,
+                ),
+                SyncJob(
+                    Product,
+                    [Product(code="B", name="Banana", price=20, category="fruit")],
+                    SyncSpec(["code"], ["name", "price", "category"]),
+                    skip_creates=False,
+                ),
+                SyncJob(Product, [], SyncSpec(["code"], ["name"]), skip_deletes=False, delete_filter="false"),
+            ],
+            max_workers=2,
+        )
+
+        self.assertEqual(
+            [
+                {"stats": {"inserted": 0, "updated": 1, "deleted": 1}},
+                {"stats": {"inserted": 1, "updated": 0, "deleted": 0}},
+                {"stats": {"inserted": 0, "updated": 0, "deleted": 0}},
+            ],
+            results,
+        )
+        self.assertEqual([("Scott", 41)], list(Employee.objects.values_list("name", "age")))
+        self.assertEqual(["A", "B"], list(Product.objects.order_by("code").values_list("code", flat=True)))
@@ -460,3 +460,32 @@ class BulkCompareTests(TestCase):
         self.assertEqual([new_objs[0]], ret["updated"])
         self.assertEqual({new_objs[0]: {"age": (40, 41)}}, ret["updated_details"])
         self.assertEqual([new_objs[1]], ret["unchanged"])
+
+    def test_bulk_compare_with_reverse_relations(self):
+        self.setupEmployees()
+
+        new_objs = [Company(name="Foo Products, Ltd."), Company(name="Baz Pumps, Inc.")]
+
+        ret = bulk_compare(old_models=Company.objects.order_by("name"), new_models=new_objs, key_fields=("name",))
+
+        self.assertEqual([new_objs[1]], ret["added"])
+        self.assertEqual([self.c2], list(ret["removed"]))
+        self.assertEqual([], ret["updated"])
+        self.assertEqual([new_objs[0]], ret["unchanged"])
+
+    def test_bulk_compare_ignores_m2m_fields(self):
+        o1 = Office.objects.create(id="office1")
+        Office.objects.create(id="office2")
+        c1 = Company.objects.create(name="Foo Products, Ltd.")
+        e1 = EmployeeWithOffice.objects.create(name="Scott", age=40, company=c1)
+        EmployeeOffice.objects.create(employee=e1, office=o1)
+
+        new_objs = [Office(id="office1"), Office(id="office2")]
+
+        ret = bulk_compare(old_models=Office.objects.order_by("id"), new_models=new_objs, key_fields=("id",))
+
+        self.assertEqual([], ret["added"])
+        self.assertEqual([], list(ret["removed"]))
+        self.assertEqual([], ret["updated"])
+        self.assertEqual({}, ret["updated_details"])
+        self.assertEqual(new_objs, ret["unchanged"])